@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Streaming bulk importer for legacy tracker JSON, CSV exports and NDJSON"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+FORMATS = ("legacy", "csv", "ndjson")
+EXTENSIONS = {".json": "legacy", ".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+FIELD_ALIASES = {"broker": "broker_name", "added": "added_at"}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD_SIZE = 1024 * 1024
+LOOKAHEAD = 16
+HEAD_SIZE = 1024
+ARRAY_START = re.compile(r'\s*(\[|\{\s*"apartments"\s*:\s*\[)')
+WHITESPACE = re.compile(r"\s*")
+RENT_PATTERN = re.compile(r"\d+(\.\d+)?")
+EMPTY_TAIL = ',\n  "inquiries_sent": [],\n  "last_scrape": null\n}'
+
+class ImportInProgressError(RuntimeError):
+    pass
+
+def detect_format(filename):
+    fmt = EXTENSIONS.get(os.path.splitext(filename or "")[1].lower())
+    if not fmt:
+        raise ValueError(f"Cannot detect import format for '{filename}', expected one of {', '.join(FORMATS)}")
+    return fmt
+
+class ApartmentsArray:
+    """Incrementally yields the elements of a bare list, or of {"apartments": [...]} with apartments as the first key.
+
+    head is the text up to and including the opening '['; after iteration, read_tail() returns the text after ']'.
+    """
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = fp.read(chunk_size)
+        self.pos = 0
+        while len(self.buf) < HEAD_SIZE and self._fill():
+            pass
+        match = ARRAY_START.match(self.buf)
+        if not match:
+            raise ValueError('Expected a list or an object whose first key is "apartments"')
+        self.head = self.buf[:match.end()]
+        self.pos = match.end()
+
+    def _fill(self):
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _next_char(self):
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unterminated apartments array")
+
+    def _decode(self):
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except RecursionError:
+                raise ValueError("Malformed apartments array: nested too deeply")
+            except json.JSONDecodeError as e:
+                # Errors at the very end of the buffer (or in a string still open there) may just be a record
+                # cut off by the chunk boundary; anything with text after it is a genuine syntax error.
+                truncated = e.msg.startswith("Unterminated string") or len(self.buf) - e.pos <= LOOKAHEAD
+                if not truncated:
+                    raise ValueError(f"Malformed apartments array: {e.msg}")
+                if len(self.buf) - self.pos > MAX_RECORD_SIZE:
+                    raise ValueError(f"Apartment record exceeds {MAX_RECORD_SIZE} characters")
+                if not self._fill():
+                    raise ValueError("Unterminated apartments array")
+                continue
+            if end == len(self.buf) and self._fill():
+                continue
+            if end - self.pos > MAX_RECORD_SIZE:
+                raise ValueError(f"Apartment record exceeds {MAX_RECORD_SIZE} characters")
+            self.pos = end
+            return obj
+
+    def __iter__(self):
+        if self._next_char() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self._decode()
+            char = self._next_char()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed apartments array: expected ',' or ']' but found '{char}'")
+            self._next_char()
+
+    def read_tail(self):
+        return self.buf[self.pos:] + self.fp.read()
+
+def iter_legacy(fp, chunk_size=CHUNK_SIZE):
+    return iter(ApartmentsArray(fp, chunk_size))
+
+def iter_csv(fp):
+    return csv.DictReader(fp)
+
+def iter_ndjson(fp):
+    """Yield (row, error) pairs; a line that is not valid JSON gives (None, message) instead of stopping."""
+    for lineno, line in enumerate(fp, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield None, f"line {lineno}: {e.msg}"
+        except (ValueError, RecursionError) as e:
+            yield None, f"line {lineno}: {e}"
+
+def iter_records(fp, fmt):
+    """Yield (row, error) pairs for fmt; error is None unless the row itself could not be parsed."""
+    if fmt == "legacy":
+        return ((row, None) for row in iter_legacy(fp))
+    if fmt == "csv":
+        return ((row, None) for row in iter_csv(fp))
+    if fmt == "ndjson":
+        return iter_ndjson(fp)
+    raise ValueError(f"Unknown import format '{fmt}', expected one of {', '.join(FORMATS)}")
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+def _string(row, key):
+    value = row.get(key)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{key} must be a string")
+    return _text(value)
+
+def _rent(value):
+    if isinstance(value, bool):
+        raise ValueError("invalid rent")
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError("invalid rent")
+        rent = int(value)
+    else:
+        text = re.sub(r"[$,\s]", "", _text(value))
+        if not RENT_PATTERN.fullmatch(text) or not math.isfinite(float(text)):
+            raise ValueError(f"invalid rent '{_text(value)}'")
+        rent = int(float(text))
+    if rent <= 0:
+        raise ValueError("rent must be positive")
+    return rent
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return _text(value).lower() in TRUE_VALUES
+
+def dedup_key(apt):
+    """The url, or (address, rent) for apartments without one."""
+    if apt.get("url"):
+        return apt["url"]
+    return (_text(apt.get("address")).lower(), apt.get("rent"))
+
+def normalize_apartment(raw):
+    """Map a legacy/CSV/NDJSON row onto the app.py apartment schema. Raises ValueError if unusable."""
+    if not isinstance(raw, dict):
+        raise ValueError("expected an object")
+    row = {}
+    for key, value in raw.items():
+        if key is None:
+            continue
+        key = _text(key).lower().replace(" ", "_")
+        row[FIELD_ALIASES.get(key, key)] = value
+    address = _string(row, "address")
+    if not address:
+        raise ValueError("missing address")
+    days = _text(row.get("days_on_market"))
+    return {
+        "address": address,
+        "rent": _rent(row.get("rent")),
+        "neighborhood": _string(row, "neighborhood"),
+        "url": _string(row, "url"),
+        "image_url": _string(row, "image_url"),
+        "broker_name": _string(row, "broker_name"),
+        "broker_email": _string(row, "broker_email"),
+        "broker_phone": _string(row, "broker_phone"),
+        "no_fee": _flag(row.get("no_fee")),
+        "days_on_market": int(days) if days.isdigit() else None,
+        "notes": _string(row, "notes"),
+        "added_at": _string(row, "added_at") or datetime.now().isoformat(),
+        "status": _string(row, "status") or "new",
+        "selected": False,
+    }
+
+def import_apartments(fp, fmt, tracker_file, batch_size=5000, max_errors=20):
+    """Stream rows from fp into tracker_file, skipping apartments already tracked.
+
+    Existing and new apartments are streamed into a temporary file in batches of batch_size, which
+    replaces tracker_file only once the whole input has been read, so a failed import changes nothing.
+    Memory holds one batch plus the dedup index (one key per apartment), never the apartments themselves.
+    Only one import may run per tracker file at a time (ImportInProgressError otherwise), and anything else
+    written to tracker_file while an import runs is overwritten when the import finishes.
+    """
+    records = iter_records(fp, fmt)
+    id_prefix = str(int(time.time() * 1000))
+    counter = itertools.count(1)
+    stats = {"imported": 0, "duplicates": 0, "invalid": 0, "batches": 0, "errors": []}
+    seen = set()
+    batch = []
+    written = 0
+    lock_file = tracker_file + ".lock"
+
+    def write(out, apt):
+        nonlocal written
+        out.write(("," if written else "") + "\n    " + json.dumps(apt))
+        written += 1
+
+    def flush(out):
+        for apt in batch:
+            write(out, apt)
+        out.flush()
+        stats["imported"] += len(batch)
+        stats["batches"] += 1
+        batch.clear()
+
+    try:
+        os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        raise ImportInProgressError(f"Another import is already running (remove {lock_file} if it crashed)")
+    try:
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(tracker_file) or ".", suffix=".import")
+        try:
+            with open(fd, "w", encoding="utf-8") as out:
+                if os.path.exists(tracker_file):
+                    with open(tracker_file, "r", encoding="utf-8") as src:
+                        current = ApartmentsArray(src)
+                        out.write(current.head)
+                        for apt in current:
+                            seen.add(dedup_key(apt))
+                            write(out, apt)
+                        tail = current.read_tail()
+                else:
+                    out.write('{\n  "apartments": [')
+                    tail = EMPTY_TAIL
+                for row_num, (raw, error) in enumerate(records, 1):
+                    try:
+                        if error:
+                            raise ValueError(error)
+                        apt = normalize_apartment(raw)
+                    except ValueError as e:
+                        stats["invalid"] += 1
+                        if len(stats["errors"]) < max_errors:
+                            stats["errors"].append(f"row {row_num}: {e}")
+                        continue
+                    key = dedup_key(apt)
+                    if key in seen:
+                        stats["duplicates"] += 1
+                        continue
+                    seen.add(key)
+                    batch.append({"id": f"{id_prefix}-{next(counter)}", **apt})
+                    if len(batch) >= batch_size:
+                        flush(out)
+                if batch:
+                    flush(out)
+                out.write("\n  ]" + tail)
+            os.replace(tmp_file, tracker_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+    finally:
+        os.remove(lock_file)
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import apartments into data/apartments.json")
+    parser.add_argument("path", help="tracked_apartments.json, CSV export or NDJSON file")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+    import app
+    app.ensure_data_dir()
+    try:
+        fmt = args.format or detect_format(args.path)
+        with open(args.path, "r", encoding="utf-8", newline="") as f:
+            stats = import_apartments(f, fmt, app.TRACKER_FILE, batch_size=max(1, args.batch_size))
+    except (OSError, ValueError, ImportInProgressError) as e:
+        app.log_activity(f"Bulk import from {args.path} failed, no changes saved: {e}", "error")
+        return 1
+    app.log_activity(f"Bulk import from {args.path}: {stats['imported']} added, {stats['duplicates']} duplicates, {stats['invalid']} invalid")
+    for error in stats["errors"]:
+        print(f"⚠️ {error}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
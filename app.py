@@ -14,6 +14,7 @@ import time
 import random
 import csv
 import io
+from apartment_importer import import_apartments, detect_format, ImportInProgressError
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'ishan-apt-hunter-2026-pro'
@@ -258,6 +259,28 @@ def export_csv():
     output.seek(0)
     return send_file(io.BytesIO(output.getvalue().encode()), mimetype='text/csv', as_attachment=True, download_name=f'apartments_{datetime.now().strftime("%Y%m%d")}.csv')
 
+@app.route('/api/import', methods=['POST'])
+def bulk_import():
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    ensure_data_dir()
+    try:
+        fmt = request.args.get('format') or detect_format(upload.filename if upload else "")
+        batch_size = max(1, int(request.args.get('batch_size', 5000)))
+        text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        stats = import_apartments(text, fmt, TRACKER_FILE, batch_size=batch_size)
+        text.detach()
+    except ImportInProgressError as e:
+        return jsonify({"error": str(e), "imported": 0}), 409
+    except ValueError as e:
+        log_activity(f"Bulk import failed, no changes saved: {e}", "error")
+        return jsonify({"error": str(e), "imported": 0}), 400
+    except OSError as e:
+        log_activity(f"Bulk import failed, no changes saved: {e}", "error")
+        return jsonify({"error": str(e), "imported": 0}), 500
+    log_activity(f"Bulk import ({fmt}): {stats['imported']} added, {stats['duplicates']} duplicates, {stats['invalid']} invalid")
+    return jsonify(stats)
+
 @app.route('/api/clear-all', methods=['DELETE'])
 def clear_all():
     save_tracker({"apartments": [], "inquiries_sent": [], "last_scrape": None})
@@ -4,8 +4,11 @@ import os
 import sys
 import tempfile
 import shutil
+import io
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import app
+import apartment_importer
+from apartment_importer import import_apartments, iter_legacy, normalize_apartment
 
 class TestTrackerIntegration(unittest.TestCase):
     def setUp(self):
@@ -24,5 +27,150 @@ class TestTrackerIntegration(unittest.TestCase):
         loaded = app.load_tracker()
         self.assertEqual(loaded["apartments"][0]["address"], "Test")
 
+class TestBulkImport(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.tracker_file = os.path.join(self.test_dir, "apartments.json")
+        with open(self.tracker_file, "w") as f:
+            json.dump({"apartments": [{"id": "1", "address": "Existing", "rent": 2500, "url": "https://streeteasy.com/rental/1"}], "inquiries_sent": ["1"], "last_scrape": "2026-01-01"}, f, indent=2)
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+    def load(self):
+        with open(self.tracker_file) as f:
+            return json.load(f)
+    def test_legacy_format_normalized(self):
+        legacy = json.dumps({"apartments": [{"id": 7, "address": "344 East 110th Street", "rent": 2650, "url": "https://streeteasy.com/rental/2", "broker": "Cole", "added": "2026-01-01", "status": "interested", "40x_pass": True}]})
+        stats = import_apartments(io.StringIO(legacy), "legacy", self.tracker_file)
+        self.assertEqual(stats["imported"], 1)
+        data = self.load()
+        self.assertEqual(data["inquiries_sent"], ["1"])
+        self.assertEqual(data["last_scrape"], "2026-01-01")
+        apt = data["apartments"][-1]
+        self.assertIsInstance(apt["id"], str)
+        self.assertEqual(apt["broker_name"], "Cole")
+        self.assertEqual(apt["added_at"], "2026-01-01")
+        self.assertNotIn("40x_pass", apt)
+    def test_csv_dedup_and_invalid(self):
+        rows = "Address,Rent,Neighborhood,Score,40x Pass,Status,URL,Added\nA,\"$2,500\",Harlem,80,Yes,new,https://streeteasy.com/rental/1,\nB,abc,Harlem,0,No,new,u2,\nC,2600,Harlem,70,Yes,new,u3,\nD,2700,Harlem,60,Yes,new,u3,\n"
+        stats = import_apartments(io.StringIO(rows), "csv", self.tracker_file)
+        self.assertEqual((stats["imported"], stats["duplicates"], stats["invalid"]), (1, 2, 1))
+        self.assertEqual(self.load()["apartments"][-1]["rent"], 2600)
+    def test_rows_without_url_dedup_on_address_and_rent(self):
+        rows = "Address,Rent,URL\nA,2500,\nA,2600,\n"
+        import_apartments(io.StringIO(rows), "csv", self.tracker_file)
+        stats = import_apartments(io.StringIO(rows), "csv", self.tracker_file)
+        self.assertEqual((stats["imported"], stats["duplicates"]), (0, 2))
+        self.assertEqual(len(self.load()["apartments"]), 3)
+    def test_ndjson_written_in_batches(self):
+        lines = "\n".join(json.dumps({"address": f"Unit {i}", "rent": 2500, "url": f"u{i}"}) for i in range(25))
+        stats = import_apartments(io.StringIO(lines), "ndjson", self.tracker_file, batch_size=10)
+        self.assertEqual((stats["imported"], stats["batches"]), (25, 3))
+        self.assertEqual(len(self.load()["apartments"]), 26)
+    def test_missing_tracker_file_created(self):
+        os.remove(self.tracker_file)
+        import_apartments(io.StringIO('{"address": "A", "rent": 2500}'), "ndjson", self.tracker_file)
+        data = self.load()
+        self.assertEqual(len(data["apartments"]), 1)
+        self.assertEqual(data["inquiries_sent"], [])
+    def test_invalid_rents_rejected(self):
+        for rent in ["Infinity", "-Infinity", '"2,600-2,800"', '"12-34"', '"1e400"', '"$2.6k"', "0", "true", '"%s"' % ("9" * 400), "1" * 5000]:
+            with self.subTest(rent=rent):
+                stats = import_apartments(io.StringIO('{"address": "A", "rent": %s}' % rent), "ndjson", self.tracker_file)
+                self.assertEqual((stats["imported"], stats["invalid"]), (0, 1))
+        self.assertEqual(normalize_apartment({"address": "A", "rent": " $2,650.00 "})["rent"], 2650)
+    def test_non_string_fields_rejected(self):
+        for field, value in [("url", ["x"]), ("status", ["x"]), ("notes", {"a": 1}), ("broker", 5)]:
+            with self.subTest(field=field):
+                with self.assertRaises(ValueError):
+                    normalize_apartment({"address": "A", "rent": 2500, field: value})
+    def test_missing_address_rejected(self):
+        with self.assertRaises(ValueError):
+            normalize_apartment({"rent": 2500})
+    def test_truncated_legacy_leaves_tracker_unchanged(self):
+        before = self.load()
+        rows = ",".join(json.dumps({"address": f"Unit {i}", "rent": 2500}) for i in range(10))
+        with self.assertRaises(ValueError):
+            import_apartments(io.StringIO('{"apartments": [' + rows), "legacy", self.tracker_file, batch_size=2)
+        self.assertEqual(self.load(), before)
+        self.assertEqual(os.listdir(self.test_dir), ["apartments.json"])
+    def test_legacy_stream_across_chunks(self):
+        data = json.dumps([{"address": "A]", "rent": 1, "no_fee": False, "notes": None}, {"address": "B", "rent": 2.5}])
+        for chunk_size in range(1, 12):
+            self.assertEqual([r["address"] for r in iter_legacy(io.StringIO(data), chunk_size=chunk_size)], ["A]", "B"])
+    def test_legacy_nested_apartments_key_rejected(self):
+        data = json.dumps({"meta": {"apartments": []}, "apartments": [{"address": "A", "rent": 2500}]})
+        with self.assertRaises(ValueError):
+            import_apartments(io.StringIO(data), "legacy", self.tracker_file)
+    def test_legacy_oversized_record_rejected(self):
+        data = json.dumps([{"address": "A", "rent": 2500, "notes": "x" * (apartment_importer.MAX_RECORD_SIZE + 1)}])
+        with self.assertRaisesRegex(ValueError, "exceeds"):
+            list(iter_legacy(io.StringIO(data)))
+    def test_concurrent_import_rejected(self):
+        before = self.load()
+        open(self.tracker_file + ".lock", "w").close()
+        with self.assertRaises(apartment_importer.ImportInProgressError):
+            import_apartments(io.StringIO('{"address": "A", "rent": 2500}'), "ndjson", self.tracker_file)
+        self.assertEqual(self.load(), before)
+    def test_legacy_missing_comma_rejected(self):
+        with self.assertRaises(ValueError):
+            list(iter_legacy(io.StringIO('[{"a": 1} {"b": 2}]')))
+
+class TestBulkImportEntryPoints(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.original_tracker = app.TRACKER_FILE
+        self.original_log = app.LOG_FILE
+        app.TRACKER_FILE = os.path.join(self.test_dir, "test.json")
+        app.LOG_FILE = os.path.join(self.test_dir, "activity.log")
+        self.client = app.app.test_client()
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+        app.TRACKER_FILE = self.original_tracker
+        app.LOG_FILE = self.original_log
+    def test_multipart_upload(self):
+        rows = b"Address,Rent,Neighborhood,Score,40x Pass,Status,URL,Added\nA,2500,Harlem,80,Yes,new,u1,\n"
+        resp = self.client.post("/api/import", data={"file": (io.BytesIO(rows), "apartments.csv")}, content_type="multipart/form-data")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["imported"], 1)
+        self.assertEqual(app.load_tracker()["apartments"][0]["url"], "u1")
+    def test_raw_body_with_format(self):
+        body = b'{"address": "A", "rent": 2500}\n{"address": "B", "rent": 2600}\n'
+        resp = self.client.post("/api/import?format=ndjson", data=body, content_type="application/x-ndjson")
+        self.assertEqual(resp.get_json()["imported"], 2)
+        self.assertEqual(len(app.load_tracker()["apartments"]), 2)
+    def test_unknown_format_rejected(self):
+        resp = self.client.post("/api/import", data=b"{}", content_type="application/json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("error", resp.get_json())
+    def test_truncated_upload_rejected_without_changes(self):
+        resp = self.client.post("/api/import?format=legacy&batch_size=1", data=b'[{"address": "A", "rent": 2500},', content_type="application/json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["imported"], 0)
+        self.assertEqual(app.load_tracker()["apartments"], [])
+    def test_overflowing_rent_counted_invalid(self):
+        resp = self.client.post("/api/import?format=csv", data=b"Address,Rent\nA," + b"9" * 400 + b"\n", content_type="text/csv")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["invalid"], 1)
+    def test_import_already_running(self):
+        open(app.TRACKER_FILE + ".lock", "w").close()
+        resp = self.client.post("/api/import?format=ndjson", data=b'{"address": "A", "rent": 2500}', content_type="application/x-ndjson")
+        self.assertEqual(resp.status_code, 409)
+    def test_invalid_utf8_rejected(self):
+        resp = self.client.post("/api/import?format=csv", data=b"Address,Rent\n\xff,2500\n", content_type="text/csv")
+        self.assertEqual(resp.status_code, 400)
+    def test_cli_imports_file(self):
+        path = os.path.join(self.test_dir, "legacy.json")
+        with open(path, "w") as f:
+            json.dump({"apartments": [{"id": 1, "address": "A", "rent": 2500, "url": "u1", "40x_pass": True}]}, f)
+        self.assertEqual(apartment_importer.main([path]), 0)
+        self.assertEqual(apartment_importer.main([path]), 0)
+        self.assertEqual(len(app.load_tracker()["apartments"]), 1)
+    def test_cli_reports_failure(self):
+        path = os.path.join(self.test_dir, "broken.json")
+        with open(path, "w") as f:
+            f.write('{"apartments": [{"address": "A", "rent": 2500}')
+        self.assertEqual(apartment_importer.main([path]), 1)
+        self.assertFalse(os.path.exists(app.TRACKER_FILE))
+
 if __name__ == "__main__":
     unittest.main()